@@ -1,39 +1,88 @@
-import json
 import sys
 import os
+import re
+import shutil
 
-if len(sys.argv) != 5:
-    print("Usage: compare_fps.py NEW BASELINE OUTPUT THRESHOLD")
-    sys.exit(1)
+_FPS_FIELD = re.compile(rb'"fps"\s*:\s*([0-9eE.+-]+)')
 
-new_file, baseline_file, output_file, threshold = sys.argv[1:]
-threshold = float(threshold)
 
-if not os.path.exists(new_file):
-    print("benchmark_result.json not found, run parse_perf_log.py first")
-    sys.exit(1)
+def write_atomic(path, data):
+    """Write ``data`` in one call to a temp file and move it over ``path``.
 
-with open(new_file) as f:
-    new_data = json.load(f)
-new_fps = float(new_data.get("fps", 0))
+    The write is skipped when ``path`` already holds exactly ``data``.
+    """
+    existed = True
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except FileNotFoundError:
+        existed = False
+    # A unique name per writer keeps concurrent jobs from sharing a temp file;
+    # O_EXCL never reuses one and the kernel applies the umask to the mode
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp = os.path.join(directory, f".{name}.{os.getpid()}.{os.urandom(4).hex()}.tmp")
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        if existed:
+            # Keep the mode of the file being replaced, as rewriting it in place would
+            shutil.copymode(path, tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
-if new_fps == 0:
-    print("Warning: FPS is zero, logs might be incorrect")
 
-if os.path.exists(baseline_file):
-    with open(baseline_file) as f:
-        base_data = json.load(f)
-    base_fps = float(base_data.get("fps", 0))
-else:
-    base_fps = new_fps
-    with open(baseline_file, "w") as f:
-        json.dump(new_data, f)
+def extract_fps(data):
+    """Extract the "fps" value from raw JSON bytes without parsing the document."""
+    m = _FPS_FIELD.search(data)
+    return float(m.group(1)) if m else 0.0
 
-with open(output_file, "w") as f:
-    json.dump(new_data, f)
 
-if base_fps and new_fps < base_fps * (1 - threshold / 100.0):
-    print(f"FPS decreased from {base_fps} to {new_fps}")
-    sys.exit(1)
-else:
+def read_fps(path):
+    with open(path, "rb") as f:
+        return extract_fps(f.read())
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if len(argv) != 4:
+        print("Usage: compare_fps.py NEW BASELINE OUTPUT THRESHOLD")
+        return 1
+
+    new_file, baseline_file, output_file, threshold = argv
+    threshold = float(threshold)
+
+    # The result is copied verbatim, so it is never decoded or re-encoded
+    try:
+        with open(new_file, "rb") as f:
+            new_bytes = f.read()
+    except FileNotFoundError:
+        print("benchmark_result.json not found, run parse_perf_log.py first")
+        return 1
+    new_fps = extract_fps(new_bytes)
+
+    if new_fps == 0:
+        print("Warning: FPS is zero, logs might be incorrect")
+
+    try:
+        base_fps = read_fps(baseline_file)
+    except FileNotFoundError:
+        base_fps = new_fps
+        write_atomic(baseline_file, new_bytes)
+
+    write_atomic(output_file, new_bytes)
+
+    if base_fps and new_fps < base_fps * (1 - threshold / 100.0):
+        print(f"FPS decreased from {base_fps} to {new_fps}")
+        return 1
     print(f"FPS {new_fps}, baseline {base_fps}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,28 +1,106 @@
 import json
-import re
+import mmap
+import multiprocessing
+import os
 import sys
 
-if len(sys.argv) != 3:
-    print("Usage: parse_perf_log.py LOG OUTPUT")
-    sys.exit(1)
+# Logs smaller than this are parsed inline; pool start-up would dominate
+PARALLEL_MIN_SIZE = 1 << 20
 
-log_path, out_path = sys.argv[1:3]
 
-fps_values = []
-with open(log_path) as f:
-    for line in f:
-        m = re.search(r"\d+ candles: ([0-9.]+) FPS", line)
-        if m:
-            fps_values.append(float(m.group(1)))
+def _dumps(obj):
+    return json.dumps(obj, separators=(",", ":")).encode()
 
-if not fps_values:
-    print("No FPS data found in log, assuming zero")
-    # Zero FPS is allowed to keep the pipeline green without measurements
-    with open(out_path, "w") as f:
-        json.dump({"fps": 0.0}, f)
-    sys.exit(0)
 
-fps = sum(fps_values) / len(fps_values) if fps_values else 0.0
+def _scan_range(job):
+    """Sum FPS values of the lines starting in ``[start, end)``."""
+    path, start, end = job
+    total = 0.0
+    n = 0
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        pos = start
+        while True:
+            # Lines look like "1000 candles: 60.00 FPS", optionally prefixed
+            hit = mm.find(b" FPS", pos, end)
+            if hit < 0:
+                break
+            pos = hit + 4
+            line_start = max(mm.rfind(b"\n", start, hit) + 1, start)
+            colon = mm.rfind(b": ", line_start, hit)
+            if (
+                colon < line_start + 9
+                or mm[colon - 8:colon] != b" candles"
+                or not mm[colon - 9:colon - 8].isdigit()
+            ):
+                continue
+            # Only plain decimals are measurements; float() would also take
+            # "nan", "inf", signs, exponents and underscores
+            num = mm[colon + 2:hit]
+            if not num or num.translate(None, b"0123456789."):
+                continue
+            try:
+                total += float(num)
+            except ValueError:
+                continue
+            n += 1
+            # Count at most one measurement per line, like re.search did
+            eol = mm.find(b"\n", hit, end)
+            pos = end if eol < 0 else eol + 1
+    return total, n
 
-with open(out_path, "w") as f:
-    json.dump({"fps": fps}, f)
+
+def _split_ranges(path, size, parts):
+    """Split the file into ``parts`` byte ranges aligned to line starts."""
+    bounds = [0]
+    with open(path, "rb") as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+    bounds.append(size)
+    return [(path, a, b) for a, b in zip(bounds, bounds[1:]) if a < b]
+
+
+def parse_log(path):
+    """Return ``(total, count)`` of all FPS measurements in the log."""
+    size = os.stat(path).st_size
+    if not size:
+        # mmap refuses to map empty files
+        return 0.0, 0
+    workers = os.cpu_count() or 1
+    if size < PARALLEL_MIN_SIZE or workers < 2:
+        return _scan_range((path, 0, size))
+    jobs = _split_ranges(path, size, workers)
+    with multiprocessing.Pool(len(jobs)) as pool:
+        results = pool.map(_scan_range, jobs)
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def main(argv=None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    if len(argv) != 2:
+        print("Usage: parse_perf_log.py LOG OUTPUT")
+        return 1
+
+    log_path, out_path = argv
+
+    total, n = parse_log(log_path)
+
+    if not n:
+        print("No FPS data found in log, assuming zero")
+        # Zero FPS is allowed to keep the pipeline green without measurements
+        with open(out_path, "wb") as f:
+            f.write(_dumps({"fps": 0.0}))
+        return 0
+
+    fps = total / n
+
+    with open(out_path, "wb") as f:
+        f.write(_dumps({"fps": fps}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
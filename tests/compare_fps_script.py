@@ -1,17 +1,76 @@
-import subprocess
+import json
+import os
 import sys
 from pathlib import Path
 
+import pytest
 
-def test_missing_file(tmp_path):
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import compare_fps  # noqa: E402
+
+
+def test_missing_file(tmp_path, capsys):
     missing = tmp_path / "benchmark_result.json"
     baseline = tmp_path / "baseline.json"
     output = tmp_path / "result.json"
-    result = subprocess.run(
-        [sys.executable, str(Path(__file__).resolve().parent.parent / "scripts" / "compare_fps.py"),
-         str(missing), str(baseline), str(output), "5"],
-        capture_output=True, text=True
-    )
-    assert result.returncode == 1
-    assert "benchmark_result.json not found" in result.stdout
+    assert compare_fps.main([str(missing), str(baseline), str(output), "5"]) == 1
+    assert "benchmark_result.json not found" in capsys.readouterr().out
+
+
+def test_fps_regression(tmp_path, capsys):
+    new = tmp_path / "benchmark_result.json"
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "result.json"
+    new.write_text(json.dumps({"fps": 90.0}))
+    baseline.write_text(json.dumps({"fps": 100.0}))
+    assert compare_fps.main([str(new), str(baseline), str(output), "5"]) == 1
+    assert "FPS decreased from 100.0 to 90.0" in capsys.readouterr().out
+    assert json.loads(output.read_text()) == {"fps": 90.0}
+
+
+def test_seeds_missing_baseline(tmp_path, capsys):
+    new = tmp_path / "benchmark_result.json"
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "result.json"
+    new.write_text(json.dumps({"fps": 60.0}))
+    assert compare_fps.main([str(new), str(baseline), str(output), "5"]) == 0
+    assert "FPS 60.0, baseline 60.0" in capsys.readouterr().out
+    assert baseline.read_bytes() == new.read_bytes()
+    assert output.read_bytes() == new.read_bytes()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "baseline.json", "benchmark_result.json", "result.json"]
+
+
+def test_unchanged_output_not_rewritten(tmp_path):
+    new = tmp_path / "benchmark_result.json"
+    baseline = tmp_path / "baseline.json"
+    output = tmp_path / "result.json"
+    new.write_text(json.dumps({"fps": 60.0}))
+    baseline.write_text(json.dumps({"fps": 60.0}))
+    output.write_bytes(new.read_bytes())
+    os.utime(output, ns=(0, 0))
+    assert compare_fps.main([str(new), str(baseline), str(output), "5"]) == 0
+    assert output.stat().st_mtime_ns == 0
+
+
+def test_failed_write_leaves_no_temp_file(tmp_path, monkeypatch):
+    target = tmp_path / "result.json"
+
+    def fail(*args):
+        raise OSError("replace failed")
+
+    monkeypatch.setattr(compare_fps.os, "replace", fail)
+    with pytest.raises(OSError):
+        compare_fps.write_atomic(str(target), b'{"fps":1.0}')
+    assert list(tmp_path.iterdir()) == []
+
 
+def test_replaced_output_keeps_mode(tmp_path):
+    target = tmp_path / "result.json"
+    target.write_bytes(b'{"fps":1.0}')
+    target.chmod(0o640)
+    compare_fps.write_atomic(str(target), b'{"fps":2.0}')
+    assert target.read_bytes() == b'{"fps":2.0}'
+    assert target.stat().st_mode & 0o777 == 0o640
+    assert [p.name for p in tmp_path.iterdir()] == ["result.json"]
@@ -1,18 +1,94 @@
 import json
-import subprocess
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
 
-def test_no_fps_in_log(tmp_path):
+import parse_perf_log  # noqa: E402
+
+
+def test_no_fps_in_log(tmp_path, capsys):
     log = tmp_path / "log.txt"
     log.write_text("some output without fps\n")
     output = tmp_path / "result.json"
-    result = subprocess.run(
-        [sys.executable, str(Path(__file__).resolve().parent.parent / "scripts" / "parse_perf_log.py"),
-         str(log), str(output)],
-        capture_output=True, text=True
-    )
-    assert result.returncode == 0
+    assert parse_perf_log.main([str(log), str(output)]) == 0
     assert json.loads(output.read_text()) == {"fps": 0.0}
-    assert "No FPS data found in log" in result.stdout
+    assert "No FPS data found in log" in capsys.readouterr().out
+
+
+def test_average_fps(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text(
+        "running benchmarks\n"
+        "1000 candles: 60.00 FPS\n"
+        "⚠ 5000 candles: 30.00 FPS\n"
+        "test result: ok\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "result.json"
+    assert parse_perf_log.main([str(log), str(output)]) == 0
+    assert json.loads(output.read_text()) == {"fps": 45.0}
+
+
+def test_large_log_parsed_in_chunks(tmp_path, monkeypatch):
+    log = tmp_path / "log.txt"
+    noise = "x" * 100 + "\n"
+    with log.open("w", encoding="utf-8") as f:
+        for i in range(20000):
+            f.write(noise)
+            f.write(f"{i} candles: {10.0 if i % 2 else 20.0:.2f} FPS\n")
+    size = log.stat().st_size
+    assert size > parse_perf_log.PARALLEL_MIN_SIZE
+
+    ranges = parse_perf_log._split_ranges(str(log), size, 4)
+    data = log.read_bytes()
+    assert ranges[0][1] == 0 and ranges[-1][2] == size
+    for (_, _, end), (_, start, _) in zip(ranges, ranges[1:]):
+        assert end == start
+        assert data[start - 1:start] == b"\n"
+
+    # Force the pool even on single-CPU runners
+    monkeypatch.setattr(parse_perf_log.os, "cpu_count", lambda: 4)
+    split_calls = []
+    split_ranges = parse_perf_log._split_ranges
+    monkeypatch.setattr(
+        parse_perf_log,
+        "_split_ranges",
+        lambda *args: split_calls.append(args) or split_ranges(*args),
+    )
+    pooled = parse_perf_log.parse_log(str(log))
+    assert split_calls
+    assert pooled == parse_perf_log._scan_range((str(log), 0, size))
+    assert pooled[1] == 20000
+
+    output = tmp_path / "result.json"
+    assert parse_perf_log.main([str(log), str(output)]) == 0
+    assert json.loads(output.read_text()) == {"fps": 15.0}
+
+
+def test_rejects_malformed_fps_lines(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text(
+        "many candles: 60.00 FPS\n"
+        "1 candles: NaN FPS\n"
+        "1 candles: inf FPS\n"
+        "1 candles: -5 FPS\n"
+        "1 candles: 1e3 FPS\n"
+        "1 candles: 1_0 FPS\n"
+        "1 candles:   60 FPS\n"
+        "1 candles: 1.2.3 FPS\n"
+        "a 1000 candles: 20.00 FPS 2000 candles: 30.00 FPS\n"
+        "1 candles: 20.00 FPS\n"
+    )
+    output = tmp_path / "result.json"
+    assert parse_perf_log.main([str(log), str(output)]) == 0
+    assert json.loads(output.read_text()) == {"fps": 20.0}
+    assert parse_perf_log.parse_log(str(log)) == (40.0, 2)
+
+
+def test_output_is_compact(tmp_path):
+    log = tmp_path / "log.txt"
+    log.write_text("1000 candles: 60.00 FPS\n")
+    output = tmp_path / "result.json"
+    assert parse_perf_log.main([str(log), str(output)]) == 0
+    assert output.read_bytes() == b'{"fps":60.0}'